@@ -11,8 +11,15 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.cache import load_excel_cached
-from src.io_excel import discover_signals, extract_signal
+from src.cache import (
+    column_digests,
+    discover_signals_cached,
+    extract_signal_cached,
+    fft_magnitude_batch_cached,
+    fft_magnitude_cached,
+    hist_counts_cached,
+    load_excel_cached,
+)
 from src.models import SeriesData
 from src.processing import moving_average
 from src.plotting import (
@@ -20,6 +27,7 @@ from src.plotting import (
     make_frequency_polygon_1x3,
     make_plotly_3d_signals,
     fig_to_png_bytes,
+    row_spectra,
 )
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
@@ -57,6 +65,7 @@ with st.sidebar:
     )
     max_points_3d = st.number_input("Max 3D points", min_value=200, max_value=50000, value=5000, step=500)
     marker_size = st.slider("3D marker size", min_value=1, max_value=10, value=3, step=1)
+    webgl_2d = st.toggle("Use WebGL 2D projection for very large N", value=False)
 
 # =========================================================
 # Upload Excel
@@ -75,7 +84,7 @@ except Exception as exc:
     st.error(f"Failed to read Excel file: {exc}")
     st.stop()
 
-signals = discover_signals(df)
+signals = discover_signals_cached(df)
 if not signals:
     st.error(
         "No signals found. Expected columns like:\n"
@@ -102,39 +111,83 @@ with st.sidebar:
 selected = [s1, s2, s3]
 
 # Build series: (label, t, y, y_ma)
-series_list: list[SeriesData] = []
+# Derived arrays live in session_state (one entry per signal name, stamped with
+# file + MA window) so reruns from display-only controls skip extract + MA.
+# Values are float32 (plot precision); time stays float64 so dt stays exact.
+series_cache: dict = st.session_state.setdefault("series_cache", {})
+stamp = (uploaded.file_id, int(ma_window))
+
+
+# Per-column content digests, computed once per upload: extraction is cached on
+# the two digests it reads instead of hashing the whole DataFrame.
+if st.session_state.get("column_digests", (None,))[0] != uploaded.file_id:
+    st.session_state["column_digests"] = (uploaded.file_id, column_digests(df))
+digests = st.session_state["column_digests"][1]
 
-for name in selected:
+
+def build_series(name: str) -> SeriesData:
     sig = by_name[name]
-    t_s, y_s = extract_signal(df, sig)
+    t, y = extract_signal_cached(digests[sig.time_col], digests[sig.value_col], df, sig)
+    y_ma = moving_average(y, int(ma_window), mode="trailing")  # float32 like y
+    return SeriesData(name=name, t=t, y=y, y_ma=y_ma)
+
 
-    t = t_s.to_numpy(dtype=float)
-    y = y_s.to_numpy(dtype=float)
-    y_ma = moving_average(y, int(ma_window), mode="trailing")
+# Build stale/missing rows (a signal picked for several rows is built once)
+for name in dict.fromkeys(selected):
+    if series_cache.get(name, (None,))[0] != stamp:
+        series_cache[name] = (stamp, build_series(name))
 
-    series_list.append(SeriesData(name=name, t=t, y=y, y_ma=y_ma))
+series_list: list[SeriesData] = [series_cache[name][1] for name in selected]
 
 
 # =========================================================
 # 3x3 plot (Matplotlib) + download
 # =========================================================
 st.subheader("3×3 Analysis Plot (Time + Histogram + FFT)")
-fig_3x3 = make_3x3_figure(series_list, bins=int(hist_bins))
-png_3x3 = fig_to_png_bytes(fig_3x3)
-
-st.image(png_3x3, use_container_width=True)
-st.download_button("Download 3×3 plot PNG", png_3x3, "plot_3x3.png", "image/png")
+# FFTs and histograms go through the cross-rerun caches; the histograms are
+# shared with the frequency polygon below
+spectra = row_spectra(series_list, fft=fft_magnitude_cached, fft_batch=fft_magnitude_batch_cached)
+hists = [hist_counts_cached(s.y, int(hist_bins)) for s in series_list]
+
+# Figures are kept per session and redrawn in place on each rerun
+fig_3x3 = make_3x3_figure(
+    series_list, bins=int(hist_bins), fig=st.session_state.get("fig_3x3"), spectra=spectra, hists=hists
+)
+st.session_state["fig_3x3"] = fig_3x3
+
+# st.pyplot's own savefig defaults to bbox_inches="tight" at dpi=200: skip the
+# extra tight-bbox render (constrained layout already fits) and match the PNG dpi
+st.pyplot(fig_3x3, width="stretch", bbox_inches=None, dpi=160)
+# PNG bytes are only rendered when the button is clicked. Streamlit runs that
+# callable on a worker thread, so it draws a fresh figure from this run's data
+# rather than the session figure a rerun may be redrawing; "ignore" skips the
+# rerun a click would otherwise start.
+st.download_button(
+    "Download 3×3 plot PNG",
+    lambda: fig_to_png_bytes(make_3x3_figure(series_list, bins=int(hist_bins), spectra=spectra, hists=hists)),
+    "plot_3x3.png",
+    "image/png",
+    on_click="ignore",
+)
 
 # =========================================================
 # Frequency polygon (Matplotlib) + download
 # =========================================================
 if show_freq_poly:
     st.subheader("1×3 Frequency Polygon")
-    fig_poly = make_frequency_polygon_1x3(series_list, bins=int(hist_bins))
-    png_poly = fig_to_png_bytes(fig_poly)
-
-    st.image(png_poly, use_container_width=True)
-    st.download_button("Download frequency polygon PNG", png_poly, "freq_polygon.png", "image/png")
+    fig_poly = make_frequency_polygon_1x3(
+        series_list, bins=int(hist_bins), fig=st.session_state.get("fig_poly"), hists=hists
+    )
+    st.session_state["fig_poly"] = fig_poly
+
+    st.pyplot(fig_poly, width="stretch", bbox_inches=None, dpi=160)
+    st.download_button(
+        "Download frequency polygon PNG",
+        lambda: fig_to_png_bytes(make_frequency_polygon_1x3(series_list, bins=int(hist_bins), hists=hists)),
+        "freq_polygon.png",
+        "image/png",
+        on_click="ignore",
+    )
 
 # =========================================================
 # Interactive 3D Plotly (NO download)
@@ -148,6 +201,7 @@ if show_3d:
             max_points=int(max_points_3d),
             marker_size=int(marker_size),
             color_by=str(color_by),
+            webgl_2d=bool(webgl_2d),
         )
         st.plotly_chart(fig3d, use_container_width=True)
         st.caption("Note: 3D plot is interactive in the browser. (To download Plotly plots click camera emoji.)")
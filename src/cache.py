@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from src.io_excel import load_excel
+from src.io_excel import Signal, discover_signals, extract_signal, load_excel
+from src.processing import fft_magnitude, fft_magnitude_batch, hist_counts
+
+
+def _hash_ndarray(a: np.ndarray) -> tuple:
+    """Cheap content key for arrays: shape, dtype and an 8-byte blake2b digest."""
+    return a.shape, a.dtype.str, hashlib.blake2b(a.tobytes(), digest_size=8).digest()
 
 
 @st.cache_data(show_spinner="Reading Excel file...")
@@ -11,8 +20,79 @@ def load_excel_cached(uploaded_file) -> pd.DataFrame:
     """
     Cached Excel loader.
 
-    We cache only the DataFrame because it is serializable and large enough
-    to benefit from caching. Signal discovery/extraction stays uncached
-    for simplicity and reliability across environments.
+    We cache the DataFrame because it is serializable and large enough
+    to benefit from caching.
     """
     return load_excel(uploaded_file)
+
+
+def _hash_columns(df: pd.DataFrame) -> tuple:
+    """Key a DataFrame by its column labels only (no per-cell hashing)."""
+    return tuple(map(str, df.columns))
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _hash_columns})
+def discover_signals_cached(df: pd.DataFrame) -> list[Signal]:
+    """
+    Cached `discover_signals`.
+
+    Discovery only reads column names, so the key is the column labels rather
+    than Streamlit's default hash that walks every cell. (Keying on id(df) does
+    not work: cache_data hands back a fresh copy of the frame on every rerun.)
+    """
+    return discover_signals(df)
+
+
+def column_digests(df: pd.DataFrame) -> dict:
+    """
+    8-byte content digest per column. Compute once per upload and pass the
+    relevant digests to `extract_signal_cached` instead of the whole frame.
+    """
+    return {
+        c: hashlib.blake2b(
+            pd.util.hash_pandas_object(df[c], index=False).to_numpy().tobytes(), digest_size=8
+        ).digest()
+        for c in df.columns
+    }
+
+
+# The array caches below are shared by every session on the server; max_entries
+# bounds them (least recently used entries are evicted first)
+@st.cache_data(show_spinner=False, max_entries=64)
+def extract_signal_cached(
+    time_digest: bytes, value_digest: bytes, _df: pd.DataFrame, _signal: Signal
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cached `extract_signal`.
+
+    The result depends only on the two columns' contents, so the key is their
+    digests; `_df`/`_signal` are underscore-prefixed so Streamlit skips hashing them.
+    """
+    return extract_signal(_df, _signal)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={np.ndarray: _hash_ndarray}, max_entries=32)
+def fft_magnitude_cached(t: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cached `fft_magnitude`.
+
+    The FFT is the heaviest step of the 3x3 figure and does not depend on the
+    display controls (bins, marker size), so reruns reuse the last result.
+    """
+    return fft_magnitude(t, y)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={np.ndarray: _hash_ndarray}, max_entries=16)
+def fft_magnitude_batch_cached(t: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cached `fft_magnitude_batch` (rows sharing one time axis).
+    """
+    return fft_magnitude_batch(t, ys)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={np.ndarray: _hash_ndarray}, max_entries=32)
+def hist_counts_cached(y: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cached `hist_counts`, shared by the 3x3 histogram and the frequency polygon.
+    """
+    return hist_counts(y, bins)
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import logging
+import re
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
 TIME_PREFIX = "Time - "
 
+SEPARATOR = " - "
+
+# Zero-width match at every separator so each possible '<name>' suffix is found
+_SEPARATOR_RE = re.compile(f"(?={re.escape(SEPARATOR)})")
+
 
 @dataclass(frozen=True)
 class Signal:
@@ -22,9 +30,17 @@ def load_excel(file_like, sheet_name: int | str = 0) -> pd.DataFrame:
     `file_like` can be:
       - a filesystem path (str/Path)
       - a Streamlit UploadedFile object
+    Uses python-calamine when installed, otherwise openpyxl.
     """
-    df = pd.read_excel(file_like, sheet_name=sheet_name, engine="openpyxl")
+    try:
+        # Rust-based reader; much faster than openpyxl on large sheets
+        df = pd.read_excel(file_like, sheet_name=sheet_name, engine="calamine")
+    except ImportError:
+        df = pd.read_excel(file_like, sheet_name=sheet_name, engine="openpyxl")
     df = df.dropna(axis=0, how="all").dropna(axis=1, how="all")
+    # Arrow-backed dtypes: numeric columns become typed arrays (no object
+    # dtype), so extract_signal's casts and masks are vectorized kernels.
+    df = df.convert_dtypes(dtype_backend="pyarrow")
     return df
 
 
@@ -37,14 +53,20 @@ def discover_signals(df: pd.DataFrame) -> List[Signal]:
     cols = [c for c in df.columns if isinstance(c, str)]
     time_cols = [c for c in cols if c.startswith(TIME_PREFIX)]
 
+    # Single pass: bucket each column under every name it ends with
+    # ('A - B - C' -> 'B - C' and 'C'), keeping column order.
+    by_name: dict[str, List[str]] = defaultdict(list)
+    for c in cols:
+        for m in _SEPARATOR_RE.finditer(c):
+            by_name[c[m.start() + len(SEPARATOR):]].append(c)
+
     signals: List[Signal] = []
     for tcol in time_cols:
         name = tcol[len(TIME_PREFIX):].strip()
         if not name:
             continue
 
-        suffix = f" - {name}"
-        candidates = [c for c in cols if c != tcol and c.endswith(suffix)]
+        candidates = [c for c in by_name.get(name, ()) if c != tcol]
 
         if not candidates:
             logging.warning("No value column found for signal '%s' (time col: '%s')", name, tcol)
@@ -57,14 +79,30 @@ def discover_signals(df: pd.DataFrame) -> List[Signal]:
     return signals
 
 
-def extract_signal(df: pd.DataFrame, signal: Signal) -> Tuple[pd.Series, pd.Series]:
+def _to_float(col: pd.Series) -> pd.Series:
+    """
+    Cast a column to float64[pyarrow]; non-numeric entries become <NA>.
+    Numeric columns take a direct Arrow cast, mixed/text ones are coerced.
+    Datetimes become seconds since the epoch and durations seconds, so a
+    datetime time axis gives FFT frequencies in Hz.
+    """
+    if col.dtype.kind == "M":  # numpy, tz-aware and Arrow timestamps
+        col = col - pd.Timestamp(0, tz=col.dt.tz)
+    if col.dtype.kind == "m":
+        col = col / pd.Timedelta(seconds=1)  # NaT -> NaN/<NA>
+    if not pd.api.types.is_numeric_dtype(col.dtype):
+        # via object: to_numeric on Arrow strings yields NaN, not <NA>, for bad cells
+        col = pd.to_numeric(col.astype(object), errors="coerce")
+    return col.astype("float64[pyarrow]")
+
+
+def extract_signal(df: pd.DataFrame, signal: Signal) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Returns (time, value) as numeric Series, NaNs removed & aligned.
+    Returns (time, value) as aligned ndarrays with non-finite rows removed.
+    Time is float64 (keeps sample spacing exact); values are float32.
     """
-    t = pd.to_numeric(df[signal.time_col], errors="coerce")
-    y = pd.to_numeric(df[signal.value_col], errors="coerce")
+    t = _to_float(df[signal.time_col]).to_numpy(dtype=np.float64, na_value=np.nan)
+    y = _to_float(df[signal.value_col]).to_numpy(dtype=np.float32, na_value=np.nan)
 
-    mask = t.notna() & y.notna()
-    t = t[mask].reset_index(drop=True)
-    y = y[mask].reset_index(drop=True)
-    return t, y
+    finite = np.isfinite(t) & np.isfinite(y)
+    return t[finite], y[finite]
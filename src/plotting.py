@@ -1,36 +1,148 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import Sequence
+from typing import Callable, Sequence
 
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
 import plotly.graph_objects as go
+import plotly.io as pio
 
 from src.models import SeriesData
-from src.processing import fft_magnitude
+from src.processing import fft_magnitude, fft_magnitude_batch, hist_counts, minmax_decimate
+
+# orjson serializes the numpy marker arrays far faster than the stdlib json
+# encoder; st.plotly_chart serializes through plotly.io.to_json
+pio.json.config.default_engine = "orjson"
+
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+except ImportError:  # optional accelerator
+    MinMaxLTTBDownsampler = None
+
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:  # optional accelerator
+    ds = tf = None
+
+
+# Time-series lines longer than this are min/max decimated before plotting
+DECIMATE_ABOVE = 4000
+DECIMATE_POINTS = 2000
+
+# Longer than this (and datashader installed): rasterize the lines server-side
+DATASHADE_ABOVE = 500_000
+DATASHADE_SIZE = (800, 200)  # canvas width, height in pixels
+
+# Above this many 3D points the optional WebGL 2D projection takes over
+WEBGL_2D_ABOVE = 20_000
 
 
 # =========================================================
 # Matplotlib plots (downloadable PNG)
 # =========================================================
-def make_3x3_figure(series: Sequence[SeriesData], bins: int = 30) -> plt.Figure:
+def _plot_decimated(ax: Axes, t: np.ndarray, y: np.ndarray, **kwargs) -> None:
+    if len(y) > DECIMATE_ABOVE:
+        idx = minmax_decimate(y, DECIMATE_POINTS)
+        t, y = t[idx], y[idx]
+    ax.plot(t, y, **kwargs)
+
+
+def _shade_lines(ax: Axes, t: np.ndarray, lines: Sequence[tuple[np.ndarray, str, str]]) -> None:
+    """
+    Draw (values, label, color) lines as datashader-aggregated RGBA images
+    on a shared extent, with empty proxy lines for the legend.
+    """
+    x_range = (float(t.min()), float(t.max()))
+    y_range = (min(float(v.min()) for v, _, _ in lines), max(float(v.max()) for v, _, _ in lines))
+    width, height = DATASHADE_SIZE
+    cvs = ds.Canvas(plot_width=width, plot_height=height, x_range=x_range, y_range=y_range)
+
+    for v, label, color in lines:
+        agg = cvs.line(pd.DataFrame({"t": t, "y": v}), "t", "y")
+        img = tf.spread(tf.shade(agg, cmap=[to_hex(color)]), px=1)
+        img = np.asarray(img.to_pil())  # row 0 = top
+        ax.imshow(img, extent=[*x_range, *y_range], aspect="auto", origin="upper", interpolation="nearest")
+        ax.plot([], [], color=color, label=label)
+
+
+def _plot_time_series(ax: Axes, t: np.ndarray, y: np.ndarray, y_ma: np.ndarray) -> None:
+    """Raw + MA lines: datashader for very long series, else decimated lines."""
+    if ds is not None and len(t) > DATASHADE_ABOVE and np.ptp(t) > 0 and np.ptp(y) > 0:
+        _shade_lines(ax, t, [(y, "raw", "C0"), (y_ma, "MA", "C1")])
+        return
+
+    # Dense data lines are rasterized; axes/labels stay vector
+    _plot_decimated(ax, t, y, label="raw", rasterized=True)
+    _plot_decimated(ax, t, y_ma, label="MA", rasterized=True)
+
+
+def _grid_axes(fig: Figure | None, nrows: int, ncols: int, figsize: tuple) -> tuple[Figure, np.ndarray]:
+    """
+    Return (fig, axes[nrows, ncols]): a new constrained-layout figure, or the
+    given one with every axes cleared so it can be redrawn.
+
+    Figures are created outside pyplot, so nothing needs plt.close().
+    """
+    if fig is None:
+        fig = Figure(figsize=figsize, layout="constrained")
+        return fig, fig.subplots(nrows, ncols, squeeze=False)
+
+    axes = np.asarray(fig.axes).reshape(nrows, ncols)
+    for ax in axes.flat:
+        ax.clear()
+    return fig, axes
+
+
+def row_spectra(
+    series: Sequence[SeriesData],
+    fft: Callable = fft_magnitude,
+    fft_batch: Callable = fft_magnitude_batch,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    (freq, magnitude) per row; one batched FFT when all rows share a time axis.
+    `fft`/`fft_batch` can be swapped for cached wrappers (see src.cache).
+    """
+    t0 = series[0].t
+    if all(len(s.y) == len(t0) for s in series) and all(np.array_equal(s.t, t0) for s in series[1:]):
+        f, mags = fft_batch(t0, np.vstack([s.y for s in series]))
+        return [(f, m) for m in mags]
+    return [fft(s.t, s.y) for s in series]
+
+
+def make_3x3_figure(
+    series: Sequence[SeriesData],
+    bins: int = 30,
+    fig: Figure | None = None,
+    spectra: Sequence[tuple[np.ndarray, np.ndarray]] | None = None,
+    hists: Sequence[tuple[np.ndarray, np.ndarray]] | None = None,
+) -> Figure:
     """
     3x3:
       Col 1: time series (raw + MA)
       Col 2: histogram (raw)
       Col 3: FFT magnitude (raw)
+    Pass a figure from a previous call as `fig` to redraw it in place.
+    `spectra` (from `row_spectra`) and `hists` (`hist_counts` per row) may be
+    precomputed, e.g. by cached wrappers; they are computed here otherwise.
     """
     if len(series) != 3:
         raise ValueError("Exactly 3 rows required")
 
-    fig, axes = plt.subplots(3, 3, figsize=(14, 9), constrained_layout=True, squeeze=False)
+    fig, axes = _grid_axes(fig, 3, 3, figsize=(14, 9))
+    if spectra is None:
+        spectra = row_spectra(series)
+    if hists is None:
+        hists = [hist_counts(s.y, bins) for s in series]
 
     for i, s in enumerate(series):
         # Time series
         ax = axes[i, 0]
-        ax.plot(s.t, s.y, label="raw")
-        ax.plot(s.t, s.y_ma, label="MA")
+        _plot_time_series(ax, s.t, s.y, s.y_ma)
         ax.set_title(f"{s.name} vs Time")
         ax.set_xlabel("Time")
         ax.set_ylabel(s.name)
@@ -38,16 +150,17 @@ def make_3x3_figure(series: Sequence[SeriesData], bins: int = 30) -> plt.Figure:
 
         # Histogram
         ax = axes[i, 1]
-        ax.hist(s.y, bins=bins)
+        counts, edges = hists[i]
+        ax.stairs(counts, edges, fill=True)
         ax.set_title(f"{s.name} Histogram")
         ax.set_xlabel(s.name)
         ax.set_ylabel("Count")
 
         # FFT
         ax = axes[i, 2]
-        f, m = fft_magnitude(s.t, s.y)
+        f, m = spectra[i]
         if f.size:
-            ax.plot(f, m)
+            ax.plot(f, m, rasterized=True)
         ax.set_title(f"{s.name} FFT Magnitude")
         ax.set_xlabel("Frequency (Hz)")
         ax.set_ylabel("Magnitude")
@@ -55,18 +168,27 @@ def make_3x3_figure(series: Sequence[SeriesData], bins: int = 30) -> plt.Figure:
     return fig
 
 
-def make_frequency_polygon_1x3(series: Sequence[SeriesData], bins: int = 30) -> plt.Figure:
+def make_frequency_polygon_1x3(
+    series: Sequence[SeriesData],
+    bins: int = 30,
+    fig: Figure | None = None,
+    hists: Sequence[tuple[np.ndarray, np.ndarray]] | None = None,
+) -> Figure:
     """
     1x3 frequency polygons (histogram as a line), one subplot per selected signal.
+    Pass a figure from a previous call as `fig` to redraw it in place, and
+    `hists` (`hist_counts` per row) to reuse the 3x3 figure's histograms.
     """
     if len(series) != 3:
         raise ValueError("Exactly 3 rows required")
 
-    fig, axes = plt.subplots(1, 3, figsize=(14, 4), constrained_layout=True, squeeze=False)
+    fig, axes = _grid_axes(fig, 1, 3, figsize=(14, 4))
+    if hists is None:
+        hists = [hist_counts(s.y, bins) for s in series]
 
     for i, s in enumerate(series):
         ax = axes[0, i]  # <-- key fix
-        counts, edges = np.histogram(s.y, bins=bins)
+        counts, edges = hists[i]
         centers = 0.5 * (edges[:-1] + edges[1:])
         ax.plot(centers, counts, marker="o")
         ax.set_title(f"{s.name} Frequency Polygon")
@@ -76,25 +198,77 @@ def make_frequency_polygon_1x3(series: Sequence[SeriesData], bins: int = 30) ->
     return fig
 
 
-def fig_to_png_bytes(fig: plt.Figure, dpi: int = 160) -> bytes:
+def fig_to_png_bytes(fig: Figure, dpi: int = 160) -> bytes:
     """
-    Convert Matplotlib figure to PNG bytes (Streamlit display + download).
+    Convert Matplotlib figure to PNG bytes (download).
+
+    No bbox_inches="tight": the figures use constrained_layout already, and the
+    tight bbox costs an extra render pass.
     """
     buf = BytesIO()
-    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
-    plt.close(fig)
+    fig.savefig(buf, format="png", dpi=dpi, metadata={"Software": None})
     return buf.getvalue()
 
 
 # =========================================================
 # Plotly interactive 3D (NO download/export)
 # =========================================================
+def _downsample_indices(t: np.ndarray, v: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick `n_out` visually representative indices of (t, v).
+
+    Uses MinMax-LTTB from `tsdownsample` when installed (keeps peaks/valleys),
+    otherwise falls back to a uniform stride.
+    """
+    n = len(v)
+    if MinMaxLTTBDownsampler is None:
+        return np.linspace(0, n - 1, n_out).astype(int)
+
+    v = np.ascontiguousarray(v, dtype=np.float64)
+    t = np.ascontiguousarray(t, dtype=np.float64)
+    if np.all(np.diff(t) >= 0):
+        idx = MinMaxLTTBDownsampler().downsample(t, v, n_out=n_out)
+    else:
+        # LTTB needs a monotonic x axis; fall back to sample index
+        idx = MinMaxLTTBDownsampler().downsample(v, n_out=n_out)
+    return idx.astype(np.intp)
+
+
+def _quantize_colors(c: np.ndarray, n_ticks: int = 5) -> tuple[np.ndarray, dict]:
+    """
+    Map a color driver onto uint8 levels (0..255) to keep the Plotly JSON small.
+    Returns (levels, colorbar tick settings labelled with the original values).
+    """
+    c = np.asarray(c, dtype=np.float64)
+    c_min = float(c.min())
+    c_span = max(float(np.ptp(c)), 1e-12)
+    # Round, not truncate: the max must land on 255 (the top colorbar tick)
+    c8 = np.rint((c - c_min) * (255.0 / c_span)).astype(np.uint8)
+
+    tickvals = np.linspace(0, 255, n_ticks)
+    ticktext = [f"{c_min + v / 255.0 * c_span:.4g}" for v in tickvals]
+    return c8, dict(tickvals=tickvals.tolist(), ticktext=ticktext)
+
+
+def _principal_plane(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project standardized (x, y, z) points onto their first two principal axes.
+    """
+    m = np.vstack([x, y, z]).astype(np.float64)
+    m -= m.mean(axis=1, keepdims=True)
+    m /= np.maximum(m.std(axis=1, keepdims=True), 1e-12)
+    u, _, _ = np.linalg.svd(m, full_matrices=False)
+    p = u[:, :2].T @ m
+    return p[0], p[1]
+
+
 def make_plotly_3d_signals(
     series: Sequence[SeriesData],
     use_ma: bool = False,
     max_points: int = 5000,
     marker_size: int = 3,
     color_by: str = "Sample index",
+    webgl_2d: bool = False,
 ) -> go.Figure:
     """
     Interactive Plotly 3D scatter:
@@ -104,6 +278,10 @@ def make_plotly_3d_signals(
       - Row 1/2/3 time
       - Row 1/2/3 value (raw or MA depending on use_ma)
     Alignment: by index (trim to min length, optional downsample).
+    Downsampling is driven by Row 1 (time, value) so the same indices are
+    applied to all three rows.
+    With webgl_2d=True and more than WEBGL_2D_ABOVE points left, a WebGL
+    Scattergl of the principal-plane projection is returned instead.
     """
     if len(series) != 3:
         raise ValueError("Exactly 3 rows required")
@@ -125,10 +303,10 @@ def make_plotly_3d_signals(
 
     # Downsample for performance
     if max_points and n > max_points:
-        idx = np.linspace(0, n - 1, int(max_points)).astype(int)
+        idx = _downsample_indices(t1, x, int(max_points))
         x, y, z = x[idx], y[idx], z[idx]
         t1, t2, t3 = t1[idx], t2[idx], t3[idx]
-        n = int(max_points)
+        n = len(idx)
 
     # Choose color driver
     if color_by == "Row 1 time":
@@ -153,20 +331,47 @@ def make_plotly_3d_signals(
         c = np.arange(n)
         ctitle = "Sample index"
 
+    # Compact payload: float32 coordinates + uint8 color levels
+    c8, cticks = _quantize_colors(c)
+    marker = dict(
+        size=marker_size,
+        color=c8,
+        cmin=0,
+        cmax=255,
+        colorscale="Viridis",
+        opacity=0.85,
+        colorbar=dict(title=ctitle, **cticks),
+    )
+
+    if webgl_2d and n > WEBGL_2D_ABOVE:
+        p1, p2 = _principal_plane(x, y, z)
+        fig = go.Figure(
+            data=[
+                go.Scattergl(
+                    x=p1.astype(np.float32),
+                    y=p2.astype(np.float32),
+                    mode="markers",
+                    marker=marker,
+                )
+            ]
+        )
+        fig.update_layout(
+            title=f"Signal Relationship, principal-plane projection ({'MA' if use_ma else 'Raw'})",
+            xaxis_title=f"PC1 ({s1.name} / {s2.name} / {s3.name}, standardized)",
+            yaxis_title="PC2",
+            height=700,
+            margin=dict(l=0, r=0, b=0, t=40),
+        )
+        return fig
+
     fig = go.Figure(
         data=[
             go.Scatter3d(
-                x=x,
-                y=y,
-                z=z,
+                x=np.asarray(x, dtype=np.float32),
+                y=np.asarray(y, dtype=np.float32),
+                z=np.asarray(z, dtype=np.float32),
                 mode="markers",
-                marker=dict(
-                    size=marker_size,
-                    color=c,
-                    colorscale="Viridis",
-                    opacity=0.85,
-                    colorbar=dict(title=ctitle),
-                ),
+                marker=marker,
             )
         ]
     )
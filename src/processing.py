@@ -1,6 +1,127 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
+import scipy.fft
+from scipy.fft import next_fast_len, rfftfreq
+from scipy.ndimage import uniform_filter1d
+
+# Module providing the scipy.fft-style `rfft` used by fft_magnitude(_batch).
+# Swap it at runtime for another implementation with the same signature, e.g.
+#   import pyfftw, pyfftw.interfaces.scipy_fft
+#   pyfftw.interfaces.cache.enable()  # reuse plans (wisdom) across calls
+#   processing.fft_backend = pyfftw.interfaces.scipy_fft
+fft_backend = scipy.fft
+
+try:
+    from numba import njit
+
+    _HAVE_NUMBA = True
+except ImportError:  # optional accelerator
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels below stay importable without numba."""
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+# fastmath is left off: it lets numba assume there is no NaN/inf, which
+# would make non-finite input undefined behaviour rather than just NaN out
+@njit(cache=True)
+def _ma_box(x: np.ndarray, w: int, left: int, out: np.ndarray) -> None:
+    """
+    Fused edge-pad + running-sum moving average (numba kernel), written into `out`.
+    `left` copies of x[0] precede the signal, `w - 1 - left` of x[-1] follow it.
+    Requires 1 <= w <= x.size. The loop is split at the two edges so the
+    steady-state part has no bounds checks.
+    """
+    n = x.size
+    first = x[0]
+    last = x[n - 1]
+    inv_w = 1.0 / w
+
+    s = first * left  # float64 accumulator whatever the input width
+    for k in range(w - left):
+        s += x[k]
+    out[0] = s * inv_w
+
+    head = left + 1          # window start still in the left padding before this
+    tail = n - w + 1 + left  # window end runs into the right padding from here
+    for i in range(1, head):
+        s += x[i + w - 1 - left] - first
+        out[i] = s * inv_w
+    for i in range(head, tail):
+        s += x[i + w - 1 - left] - x[i - 1 - left]
+        out[i] = s * inv_w
+    for i in range(tail, n):
+        s += last - x[i - 1 - left]
+        out[i] = s * inv_w
+
+
+@njit(cache=True, fastmath=True)
+def _detrend_into(signal: np.ndarray, out: np.ndarray) -> None:
+    """
+    out[:] = signal - mean(signal) (numba kernel): reads `signal` in its own
+    dtype, so float32 input needs no float64 copy first.
+    """
+    s = 0.0
+    for v in signal:
+        s += v
+    m = s / signal.size
+    for i in range(signal.size):
+        out[i] = signal[i] - m
+
+
+@njit(cache=True, fastmath=True)
+def _scaled_abs(X: np.ndarray, scale: float, out: np.ndarray) -> None:
+    """out[:] = |X| * scale (numba kernel): one pass over the complex spectrum."""
+    for i in range(X.size):
+        v = X[i]
+        out[i] = np.sqrt(v.real * v.real + v.imag * v.imag) * scale
+
+
+# Relative step jitter still treated as uniform sampling; covers the rounding
+# of linspace/arange axes, far below anything visible on a frequency axis
+_UNIFORM_RTOL = 1e-6
+
+
+@njit(cache=True)
+def _uniform_dt(time: np.ndarray) -> float:
+    """
+    (time[-1] - time[0]) / (n - 1) if every step matches the first within
+    _UNIFORM_RTOL, else NaN. Checks all steps (equal end steps say nothing
+    about a dropout mid-series) but allocates nothing and stops at the
+    first mismatch. NaN/inf steps never match.
+    """
+    d0 = time[1] - time[0]
+    tol = _UNIFORM_RTOL * abs(d0)
+    for i in range(2, time.size):
+        if not abs((time[i] - time[i - 1]) - d0) <= tol:
+            return np.nan
+    return (time[-1] - time[0]) / (time.size - 1)
+
+
+# fastmath is left off: it would let numba assume away the isfinite() check
+@njit(cache=True)
+def _median_dt(time: np.ndarray) -> float:
+    """
+    median(diff(time)) over finite steps; NaN when there is none.
+    """
+    if _HAVE_NUMBA:  # the scan is a Python loop without numba
+        dt = _uniform_dt(time)
+        if dt > 0:
+            return dt
+    dt = np.diff(time)
+    # A finite sum means no NaN/inf anywhere (one fused reduction), so the
+    # common case skips building the finite mask and its compressed copy
+    if not np.isfinite(time.sum()):
+        dt = dt[np.isfinite(dt)]
+    if dt.size == 0:
+        return np.nan
+    return np.median(dt)
 
 
 def moving_average(x: np.ndarray, window: int, mode: str = "trailing") -> np.ndarray:
@@ -19,41 +140,129 @@ def moving_average(x: np.ndarray, window: int, mode: str = "trailing") -> np.nda
     Returns
     -------
     np.ndarray
-        Smoothed signal, same length as x.
+        Smoothed signal, same length as x. Floating inputs keep their dtype
+        (float32 stays float32); other inputs are smoothed as float64.
+        With window == 1 a floating input is returned as is (not copied).
+        A NaN/inf sample only affects the outputs whose window covers it.
     """
-    x = np.asarray(x, dtype=float)
+    if not isinstance(window, (int, np.integer)) or window < 1:
+        raise ValueError("window must be an integer >= 1")
+    w = int(window)
+
+    # Both modes are the same edge-padded box filter; they differ only in
+    # how many samples of the window precede each point
+    if mode == "trailing":
+        # Window ends at each point; the start is edge-padded with x[0]
+        left = w - 1
+    elif mode == "centered":
+        # Window centered around each point; both ends edge-padded
+        left = (w - 1) // 2
+    else:
+        raise ValueError("mode must be 'trailing' or 'centered'")
+
+    x = np.asarray(x)
+    if x.ndim != 1:
+        raise ValueError("x must be 1-D")
+    if not np.issubdtype(x.dtype, np.floating):
+        x = x.astype(np.float64)
     n = x.size
-    if window <= 1 or n == 0:
-        return x.copy()
-    if window < 1:
-        raise ValueError("window must be >= 1")
-    if window > n:
+    if w == 1 or n == 0:
+        return x
+    if w > n:
         # Degenerate case: window larger than signal length
         # trailing: use mean up to each point; centered: use global mean
         if mode == "trailing":
             c = np.cumsum(x)
-            return c / np.arange(1, n + 1)
+            return c / np.arange(1, n + 1, dtype=x.dtype)
         return np.full_like(x, np.mean(x))
 
-    w = int(window)
+    if not np.isfinite(x.sum()):
+        # A running sum would carry a NaN/inf into every later output; a direct
+        # convolution of the edge-padded signal keeps it local (rare path)
+        x_pad = np.pad(x, (left, w - 1 - left), mode="edge")
+        return np.convolve(x_pad, np.full(w, 1.0 / w, dtype=x.dtype), mode="valid")
 
-    if mode == "trailing":
-        # Pad the beginning with the first sample so the output length matches input
-        x_pad = np.pad(x, (w - 1, 0), mode="edge")
-        kernel = np.ones(w, dtype=float) / w
-        y = np.convolve(x_pad, kernel, mode="valid")
-        return y
-
-    if mode == "centered":
-        # Symmetric padding; window centered around each point
-        left = (w - 1) // 2
-        right = w - 1 - left
-        x_pad = np.pad(x, (left, right), mode="edge")
-        kernel = np.ones(w, dtype=float) / w
-        y = np.convolve(x_pad, kernel, mode="valid")
-        return y
+    if _HAVE_NUMBA:
+        out = np.empty_like(x)
+        _ma_box(np.ascontiguousarray(x), w, left, out)
+        return out
+
+    # ndimage's C running sum; "nearest" is edge padding, and origin shifts its
+    # default window (starting w // 2 before each point) to start `left` before
+    return uniform_filter1d(x, size=w, mode="nearest", origin=left - w // 2)
+
+
+def minmax_decimate(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Envelope-preserving decimation for line plots.
+
+    Splits `y` into n_out // 2 equal index bins and keeps the first argmin and
+    argmax of each, so the plotted min/max envelope is exact.
+    Returns sorted unique indices (all indices if `y` is already short).
+    """
+    y = np.asarray(y)
+    n = y.size
+    n_bins = max(int(n_out) // 2, 1)
+    if n <= 2 * n_bins:
+        return np.arange(n)
+
+    starts = np.linspace(0, n, n_bins + 1).astype(np.intp)[:-1]
+    bin_id = np.repeat(np.arange(n_bins), np.diff(np.append(starts, n)))
+
+    def first_hit_per_bin(extreme: np.ndarray) -> np.ndarray:
+        hits = np.flatnonzero(y == extreme[bin_id])
+        _, first = np.unique(bin_id[hits], return_index=True)
+        return hits[first]
+
+    i_min = first_hit_per_bin(np.minimum.reduceat(y, starts))
+    i_max = first_hit_per_bin(np.maximum.reduceat(y, starts))
+    return np.union1d(i_min, i_max)
+
+
+def hist_counts(y: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Equal-width histogram via a single bucket index + np.bincount.
+    Returns (counts, edges) like np.histogram (last bin closed on the right).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    bins = int(bins)
+    if y.size == 0:
+        return np.zeros(bins, dtype=np.intp), np.linspace(0.0, 1.0, bins + 1)
 
-    raise ValueError("mode must be 'trailing' or 'centered'")
+    ymin, ymax = float(y.min()), float(y.max())
+    if ymin == ymax:
+        # Same fallback range as np.histogram for constant data
+        ymin, ymax = ymin - 0.5, ymax + 0.5
+
+    edges = np.linspace(ymin, ymax, bins + 1)
+    idx = ((y - ymin) / (ymax - ymin) * bins).astype(np.intp)
+    np.clip(idx, 0, bins - 1, out=idx)
+    # The scaled index can land one bin off the returned edges through
+    # rounding (e.g. 0.3 vs an edge of 0.30000000000000004); nudge it back
+    # the way np.histogram does so the counts agree with `edges`
+    idx[y < edges[idx]] -= 1
+    idx[(y >= edges[idx + 1]) & (idx != bins - 1)] += 1
+    counts = np.bincount(idx, minlength=bins)
+    return counts, edges
+
+
+@lru_cache(maxsize=32)
+def _rfftfreq_cached(n: int, d: float) -> np.ndarray:
+    """Read-only `rfftfreq(n, d)`, reused while the same series is re-FFTed."""
+    freq = rfftfreq(n, d=d)
+    freq.setflags(write=False)
+    return freq
+
+
+def _magnitude(X: np.ndarray, n: int) -> np.ndarray:
+    """|X| / n into a single real output array."""
+    mag = np.empty(X.shape, dtype=X.real.dtype)
+    if _HAVE_NUMBA:
+        _scaled_abs(X.ravel(), 1.0 / n, mag.ravel())
+        return mag
+    np.abs(X, out=mag)
+    mag *= 1.0 / n
+    return mag
 
 
 def fft_magnitude(time: np.ndarray, signal: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
@@ -64,23 +273,62 @@ def fft_magnitude(time: np.ndarray, signal: np.ndarray) -> tuple[np.ndarray, np.
 
     Notes:
     - Detrends by subtracting mean.
+    - Zero-pads to the next fast FFT length (finer, interpolated frequency
+      grid); magnitudes are still normalised by the original length.
     - Returns empty arrays if sampling info is invalid.
+    - float32 signals give float32 magnitudes; other inputs give float64.
+    - `freq_hz` is a shared read-only array; copy it before modifying.
+    - The transform comes from the module-level `fft_backend` (scipy.fft by
+      default; see its comment for plugging in pyfftw).
     """
     if time.size < 4 or signal.size < 4:
         return np.array([]), np.array([])
 
-    dt = np.diff(time)
-    dt = dt[np.isfinite(dt)]
-    if dt.size == 0:
+    dt_med = float(_median_dt(np.ascontiguousarray(time, dtype=np.float64)))
+    if not dt_med > 0:  # also rejects NaN (no finite dt)
         return np.array([]), np.array([])
 
-    dt_med = float(np.median(dt))
-    if dt_med <= 0:
-        return np.array([]), np.array([])
+    signal = np.asarray(signal)
+    n = signal.size
+    n_fft = next_fast_len(n, real=True)
 
-    x = signal - float(np.mean(signal))
-    n = x.size
+    # Detrend straight into the zero-padded FFT input: one buffer, no copy.
+    # (Zeroing the DC bin instead is only equivalent without padding.)
+    # float32 stays float32 (complex64 transform); anything else is float64
+    buf = np.empty(n_fft, dtype=np.promote_types(signal.dtype, np.float32))
+    if _HAVE_NUMBA:
+        _detrend_into(np.ascontiguousarray(signal), buf[:n])
+    else:
+        np.subtract(signal, signal.mean(dtype=np.float64), out=buf[:n], casting="unsafe")
+    buf[n:] = 0.0
+
+    freq = _rfftfreq_cached(n_fft, dt_med)
+    X = fft_backend.rfft(buf, workers=-1, overwrite_x=True)
+    return freq, _magnitude(X, n)
+
+
+def fft_magnitude_batch(time: np.ndarray, signals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    `fft_magnitude` for k signals sharing one time axis, in a single 2-D rfft.
+
+    `signals` has shape (k, n). Returns (freq_hz, magnitudes[k, n_freq]);
+    row i equals fft_magnitude(time, signals[i]).
+    """
+    signals = np.asarray(signals)
+    k, n = signals.shape
+    if time.size < 4 or n < 4:
+        return np.array([]), np.empty((k, 0))
+
+    dt_med = float(_median_dt(np.ascontiguousarray(time, dtype=np.float64)))
+    if not dt_med > 0:
+        return np.array([]), np.empty((k, 0))
+
+    n_fft = next_fast_len(n, real=True)
+    buf = np.empty((k, n_fft), dtype=np.promote_types(signals.dtype, np.float32))
+    mean = signals.mean(axis=1, keepdims=True, dtype=np.float64)
+    np.subtract(signals, mean, out=buf[:, :n], casting="unsafe")
+    buf[:, n:] = 0.0
 
-    freq = np.fft.rfftfreq(n, d=dt_med)
-    mag = np.abs(np.fft.rfft(x)) / n
-    return freq, mag
+    freq = _rfftfreq_cached(n_fft, dt_med)
+    X = fft_backend.rfft(buf, axis=1, workers=-1, overwrite_x=True)
+    return freq, _magnitude(X, n)
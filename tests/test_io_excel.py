@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from src.io_excel import discover_signals, extract_signal
+from src.io_excel import discover_signals, extract_signal, load_excel
 
 
 def test_discover_signals_from_headers():
@@ -20,6 +21,21 @@ def test_discover_signals_from_headers():
     assert "Measured Diameter" in names
 
 
+def test_discover_signals_names_containing_separator():
+    df = pd.DataFrame(
+        {
+            "Time - Speed": [0.0],
+            "A - Speed": [1.0],
+            "Time - Line - Speed": [0.0],
+            "B - Line - Speed": [2.0],
+            "Time - Orphan": [0.0],
+        }
+    )
+
+    by_name = {s.name: s.value_col for s in discover_signals(df)}
+    assert by_name == {"Speed": "A - Speed", "Line - Speed": "B - Line - Speed"}
+
+
 def test_extract_signal_returns_aligned_numeric_series():
     df = pd.DataFrame(
         {
@@ -36,3 +52,53 @@ def test_extract_signal_returns_aligned_numeric_series():
     assert len(t_s) == 3  # one row removed due to None
     assert t_s.dtype.kind in ("i", "u", "f")  # numeric
     assert y_s.dtype.kind in ("i", "u", "f")  # numeric
+
+
+def test_load_excel_drops_empty_rows_and_columns(tmp_path):
+    path = tmp_path / "signals.xlsx"
+    pd.DataFrame(
+        {
+            "Time - Pressure": [0.0, None, 0.2],
+            "Bar - Pressure": [1.5, None, 1.7],
+            "Empty": [None, None, None],
+        }
+    ).to_excel(path, index=False)
+
+    df = load_excel(path)
+    assert list(df.columns) == ["Time - Pressure", "Bar - Pressure"]
+    assert len(df) == 2
+
+
+def test_extract_signal_after_load_excel_drops_text_cells(tmp_path):
+    path = tmp_path / "signals.xlsx"
+    pd.DataFrame(
+        {
+            "Time - Flow": [0.0, 0.1, 0.2, 0.3],
+            "L/min - Flow": [5.0, "n/a", 5.2, None],
+        }
+    ).to_excel(path, index=False)
+
+    df = load_excel(path)
+    sig = discover_signals(df)[0]
+    t, y = extract_signal(df, sig)
+
+    assert np.allclose(t, [0.0, 0.2])
+    assert np.allclose(y, [5.0, 5.2])
+
+
+def test_extract_signal_datetime_time_column_in_seconds(tmp_path):
+    path = tmp_path / "signals.xlsx"
+    pd.DataFrame(
+        {
+            "Time - Temp": pd.date_range("2024-01-01 08:00", periods=5, freq="500ms"),
+            "degC - Temp": [20.0, 20.5, 21.0, 21.5, 22.0],
+        }
+    ).to_excel(path, index=False)
+
+    df = load_excel(path)
+    sig = discover_signals(df)[0]
+    t, y = extract_signal(df, sig)
+
+    assert len(t) == len(y) == 5
+    assert t[0] == pd.Timestamp("2024-01-01 08:00").timestamp()
+    assert np.allclose(np.diff(t), 0.5)
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from src.models import SeriesData
 from src.plotting import (
@@ -6,6 +7,7 @@ from src.plotting import (
     make_frequency_polygon_1x3,
     fig_to_png_bytes,
     make_plotly_3d_signals,
+    row_spectra,
 )
 
 
@@ -66,3 +68,79 @@ def test_make_plotly_3d_signals_requires_three_series():
         assert False, "Expected ValueError for non-3 series input"
     except ValueError:
         assert True
+
+
+def test_make_plotly_3d_signals_downsamples_to_max_points():
+    series = [_dummy_series("A", n=5000), _dummy_series("B", n=5000), _dummy_series("C", n=5000)]
+    fig = make_plotly_3d_signals(series, max_points=500)
+    assert 0 < len(fig.data[0].x) <= 500
+
+
+def test_make_plotly_3d_signals_uses_compact_marker_colors():
+    series = [_dummy_series("A"), _dummy_series("B"), _dummy_series("C")]
+    fig = make_plotly_3d_signals(series, max_points=1000, color_by="Row 1 value")
+    color = np.asarray(fig.data[0].marker.color)
+    assert color.dtype == np.uint8
+    assert color.min() == 0 and color.max() == 255
+
+
+def test_quantize_colors_maps_extremes_to_end_levels():
+    from src.plotting import _quantize_colors
+
+    c8, _ = _quantize_colors(np.array([0.1, 0.2, 0.3]))
+    assert c8.tolist() == [0, 128, 255]
+
+
+def test_make_plotly_3d_signals_webgl_projection_for_large_n():
+    series = [_dummy_series("A", n=30_000), _dummy_series("B", n=30_000), _dummy_series("C", n=30_000)]
+    fig = make_plotly_3d_signals(series, max_points=25_000, webgl_2d=True)
+    assert fig.data[0].type == "scattergl"
+
+    # Below the threshold the 3D scatter is kept
+    fig = make_plotly_3d_signals(series, max_points=5000, webgl_2d=True)
+    assert fig.data[0].type == "scatter3d"
+
+
+def test_row_spectra_uses_injected_fft_functions():
+    from src.processing import fft_magnitude, fft_magnitude_batch
+
+    calls = []
+
+    def fft(t, y):
+        calls.append("single")
+        return fft_magnitude(t, y)
+
+    def fft_batch(t, ys):
+        calls.append("batch")
+        return fft_magnitude_batch(t, ys)
+
+    shared = [_dummy_series("A"), _dummy_series("B"), _dummy_series("C")]
+    spectra = row_spectra(shared, fft=fft, fft_batch=fft_batch)
+    assert calls == ["batch"] and len(spectra) == 3
+
+    calls.clear()
+    mixed = [_dummy_series("A"), _dummy_series("B", n=400), _dummy_series("C")]
+    row_spectra(mixed, fft=fft, fft_batch=fft_batch)
+    assert calls == ["single"] * 3
+
+
+def test_make_3x3_figure_redraws_existing_figure():
+    series = [_dummy_series("A"), _dummy_series("B"), _dummy_series("C")]
+    fig = make_3x3_figure(series, bins=20)
+
+    series = [_dummy_series("D"), _dummy_series("E"), _dummy_series("F")]
+    fig2 = make_3x3_figure(series, bins=20, fig=fig)
+    assert fig2 is fig
+    assert len(fig.axes) == 9
+    assert fig.axes[0].get_title() == "D vs Time"
+    assert len(fig.axes[0].lines) == 2
+
+
+def test_make_3x3_figure_datashades_very_long_series():
+    pytest.importorskip("datashader")
+    series = [_dummy_series("A", n=600_000), _dummy_series("B"), _dummy_series("C")]
+    fig = make_3x3_figure(series, bins=20)
+
+    ax = fig.axes[0]
+    assert len(ax.images) == 2  # raw + MA rasters
+    assert [line.get_label() for line in ax.lines] == ["raw", "MA"]
@@ -1,6 +1,14 @@
 import numpy as np
+import pytest
 
-from src.processing import moving_average, fft_magnitude
+from src import processing
+from src.processing import (
+    fft_magnitude,
+    fft_magnitude_batch,
+    hist_counts,
+    minmax_decimate,
+    moving_average,
+)
 
 
 def test_moving_average_length_preserved():
@@ -22,6 +30,81 @@ def test_moving_average_window_1_returns_input():
     assert np.allclose(y, x)
 
 
+@pytest.mark.parametrize("window", [0, -3, 2.5])
+def test_moving_average_rejects_invalid_window(window):
+    with pytest.raises(ValueError):
+        moving_average(np.arange(10.0), window)
+
+
+@pytest.mark.parametrize("mode", ["trailing", "centered"])
+def test_moving_average_non_finite_sample_stays_local(mode):
+    x = np.arange(20.0)
+    x[5] = np.nan
+    y = moving_average(x, 3, mode=mode)
+
+    left = 2 if mode == "trailing" else 1
+    # Only the 3 windows covering x[5] are NaN
+    assert np.flatnonzero(np.isnan(y)).tolist() == [left + 3, left + 4, left + 5]
+    ref = np.convolve(np.pad(x, (left, 2 - left), mode="edge"), np.ones(3) / 3, mode="valid")
+    assert np.allclose(y, ref, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 2, 50])
+def test_moving_average_rejects_non_1d_input(window):
+    with pytest.raises(ValueError):
+        moving_average(np.arange(12.0).reshape(3, 4), window)
+
+
+@pytest.mark.parametrize("window", [1, 3, 50])
+def test_moving_average_rejects_unknown_mode(window):
+    # Including the window == 1 and window > n shortcuts
+    with pytest.raises(ValueError):
+        moving_average(np.arange(10.0), window, mode="leading")
+
+
+def test_moving_average_matches_edge_padded_convolution():
+    rng = np.random.default_rng(0)
+    x = 1000.0 + rng.standard_normal(2000)
+    w = 37
+
+    ref_trailing = np.convolve(np.pad(x, (w - 1, 0), mode="edge"), np.ones(w) / w, mode="valid")
+    ref_centered = np.convolve(np.pad(x, (18, 18), mode="edge"), np.ones(w) / w, mode="valid")
+
+    assert np.allclose(moving_average(x, w, mode="trailing"), ref_trailing, atol=1e-9)
+    assert np.allclose(moving_average(x, w, mode="centered"), ref_centered, atol=1e-9)
+
+
+def test_moving_average_large_window_matches_fft_convolution():
+    # Slider max window; FFT overlap-add convolution as the reference
+    from scipy.signal import oaconvolve
+
+    x = 50.0 + np.random.default_rng(4).standard_normal(20_000)
+    w = 5000
+    ref = oaconvolve(np.pad(x, (w - 1, 0), mode="edge"), np.ones(w) / w, mode="valid")
+
+    assert np.allclose(moving_average(x, w), ref, atol=1e-9)
+
+
+@pytest.mark.parametrize("window", [15, 5000])
+def test_moving_average_keeps_float32(window):
+    x64 = 20.0 + np.random.default_rng(5).standard_normal(3000)
+    y32 = moving_average(x64.astype(np.float32), window)
+
+    assert y32.dtype == np.float32
+    assert np.allclose(y32, moving_average(x64, window), atol=1e-4)
+
+
+@pytest.mark.parametrize("mode", ["trailing", "centered"])
+def test_moving_average_numba_kernel_matches_numpy_path(monkeypatch, mode):
+    pytest.importorskip("numba")
+    x = np.random.default_rng(1).standard_normal(1000)
+    y_jit = moving_average(x, 25, mode=mode)
+
+    monkeypatch.setattr(processing, "_HAVE_NUMBA", False)
+    y_np = moving_average(x, 25, mode=mode)
+    assert np.allclose(y_jit, y_np, atol=1e-9)
+
+
 def test_fft_magnitude_basic_shapes():
     # 1 second of a 10 Hz sine sampled at 1000 Hz
     fs = 1000.0
@@ -35,3 +118,143 @@ def test_fft_magnitude_basic_shapes():
     assert len(f) > 0
     assert f[0] == 0.0
     assert np.all(m >= 0.0)
+
+
+def test_fft_magnitude_peak_on_prime_length():
+    # Prime n is zero-padded to a fast length; the peak must stay put
+    fs = 1000.0
+    t = np.arange(997) / fs
+    x = np.sin(2 * np.pi * 50.0 * t)
+
+    f, m = fft_magnitude(t, x)
+    assert len(f) == len(m)
+    assert abs(f[np.argmax(m)] - 50.0) < 1.0
+
+
+def test_minmax_decimate_keeps_envelope():
+    rng = np.random.default_rng(2)
+    y = rng.standard_normal(100_000)
+
+    idx = minmax_decimate(y, 2000)
+    assert idx.size <= 2000
+    assert np.all(np.diff(idx) > 0)
+    assert y[idx].min() == y.min()
+    assert y[idx].max() == y.max()
+
+
+def test_minmax_decimate_short_input_returns_all_indices():
+    y = np.arange(10.0)
+    assert np.array_equal(minmax_decimate(y, 2000), np.arange(10))
+
+
+def test_hist_counts_matches_np_histogram():
+    y = np.random.default_rng(3).standard_normal(10_000)
+    counts, edges = hist_counts(y, 30)
+    ref_counts, ref_edges = np.histogram(y, bins=30)
+
+    assert np.array_equal(counts, ref_counts)
+    assert np.allclose(edges, ref_edges)
+
+
+@pytest.mark.parametrize(
+    "y",
+    [
+        np.arange(5) * 0.1,
+        np.round(np.random.default_rng(9).normal(20.0, 3.0, 5000), 1),
+        np.random.default_rng(10).integers(0, 37, 5000).astype(float),
+    ],
+)
+@pytest.mark.parametrize("bins", [4, 7, 30])
+def test_hist_counts_matches_np_histogram_on_quantized_data(y, bins):
+    counts, edges = hist_counts(y, bins)
+    ref_counts, ref_edges = np.histogram(y, bins=bins)
+
+    assert np.array_equal(counts, ref_counts)
+    assert np.array_equal(edges, ref_edges)
+
+
+def test_hist_counts_constant_signal():
+    counts, edges = hist_counts(np.full(50, 2.0), 10)
+    assert counts.sum() == 50
+    assert edges[0] < 2.0 < edges[-1]
+
+
+def test_fft_magnitude_matches_detrended_reference():
+    from scipy.fft import next_fast_len
+
+    t = np.arange(997) / 100.0
+    x = 3.0 + np.random.default_rng(6).standard_normal(997)
+
+    f, m = fft_magnitude(t, x)
+    n_fft = next_fast_len(997, real=True)
+    ref = np.abs(np.fft.rfft(x - x.mean(), n=n_fft)) / 997
+
+    assert np.allclose(m, ref)
+    assert m[0] < 1e-12  # mean removed
+
+
+def test_fft_magnitude_float32_in_float32_out():
+    t = np.arange(1000) / 100.0
+    x = 3.0 + np.random.default_rng(8).standard_normal(1000)
+
+    f, m64 = fft_magnitude(t, x)
+    _, m32 = fft_magnitude(t, x.astype(np.float32))
+    _, mb = fft_magnitude_batch(t, x.astype(np.float32)[None, :])
+
+    assert m64.dtype == np.float64 and m32.dtype == np.float32
+    assert mb.dtype == np.float32
+    assert np.allclose(m32, m64, atol=1e-5)
+    assert np.allclose(mb[0], m32, atol=1e-6)
+
+
+def test_fft_magnitude_ignores_non_finite_time_steps():
+    t = np.arange(200) / 50.0
+    x = np.sin(2 * np.pi * 5.0 * t)
+    t_bad = t.copy()
+    t_bad[[10, 120]] = np.nan
+
+    f, _ = fft_magnitude(t, x)
+    f_bad, _ = fft_magnitude(t_bad, x)
+    assert np.allclose(f, f_bad)
+
+
+def test_fft_magnitude_dt_ignores_mid_series_gap():
+    # Equal first and last steps, but a dropout in between: the step must
+    # still come from the median, not from the endpoints
+    t = np.arange(200) / 50.0
+    t[100:] += 1.0
+    x = np.sin(2 * np.pi * 5.0 * t)
+
+    f, _ = fft_magnitude(t, x)
+    assert np.isclose(f[-1], 0.5 / 0.02)  # Nyquist of the true 0.02 s step
+
+
+def test_fft_magnitude_batch_matches_per_series():
+    t = np.arange(500) / 100.0
+    ys = np.random.default_rng(7).standard_normal((3, 500))
+
+    f, mags = fft_magnitude_batch(t, ys)
+    assert mags.shape == (3, len(f))
+    for y, m in zip(ys, mags):
+        f1, m1 = fft_magnitude(t, y)
+        assert np.allclose(f, f1)
+        assert np.allclose(m, m1)
+
+
+def test_fft_magnitude_uses_pluggable_backend(monkeypatch):
+    import types
+
+    import scipy.fft
+
+    calls = []
+
+    def rfft(x, **kwargs):
+        calls.append(x.shape)
+        return scipy.fft.rfft(x, **kwargs)
+
+    monkeypatch.setattr(processing, "fft_backend", types.SimpleNamespace(rfft=rfft))
+    t = np.arange(256) / 100.0
+    f, m = fft_magnitude(t, np.sin(t))
+
+    assert calls == [(256,)]
+    assert len(f) == len(m)